@@ -1,6 +1,17 @@
+import hashlib
+import io
+import os
+import re
+import time
+import urllib.request
+from pathlib import Path
+
 import streamlit as st
 import pandas as pd
 import numpy as np
+import numexpr as ne
+import pyarrow as pa
+import pyarrow.parquet as pq
 import plotly.express as px
 import plotly.graph_objects as go
 
@@ -486,42 +497,50 @@ COORDS = {
     "Ameerpet":      [17.4375, 78.4483],
     "Unknown":       [17.3850, 78.4867],
 }
+COORDS_DF = pd.DataFrame.from_dict(COORDS, orient="index", columns=["lat", "lon"])
+_rng      = np.random.default_rng()  # map pin jitter
 
 TAG_RULES = [
-    ("🍛 Great Food",      lambda t: any(x in t for x in ["good food","tasty","delicious","food is good"])),
-    ("🚇 Metro Near",      lambda t: any(x in t for x in ["metro","transport","near bus","walking distance"])),
-    ("✨ Very Clean",      lambda t: any(x in t for x in ["clean","neat","maintained","hygienic","tidy"])),
-    ("🚀 Fast WiFi",       lambda t: any(x in t for x in ["wifi","internet","fast net","broadband"])),
-    ("🔒 Secure",          lambda t: any(x in t for x in ["safe","security","cctv","gated","guard"])),
-    ("🌿 Peaceful",        lambda t: any(x in t for x in ["quiet","peaceful","calm","no noise"])),
-    ("❄️ AC Rooms",        lambda t: any(x in t for x in ["ac ","air condition","ac room","air-condition"])),
-    ("🍽️ Mess Included",  lambda t: any(x in t for x in ["mess","meals included","food included","breakfast"])),
-    ("🪳 Hygiene Issue",  lambda t: any(x in t for x in ["cockroach","bugs","dirty","unclean","pest"])),
-    ("🥣 Bad Food",        lambda t: any(x in t for x in ["bad food","worst food","repetitive food","tasteless"])),
-    ("🚫 No Parking",      lambda t: any(x in t for x in ["no parking","parking issue","congested"])),
-    ("📶 Slow WiFi",       lambda t: any(x in t for x in ["slow wifi","no wifi","bad internet","no internet"])),
+    ("🍛 Great Food",      ["good food","tasty","delicious","food is good"]),
+    ("🚇 Metro Near",      ["metro","transport","near bus","walking distance"]),
+    ("✨ Very Clean",      ["clean","neat","maintained","hygienic","tidy"]),
+    ("🚀 Fast WiFi",       ["wifi","internet","fast net","broadband"]),
+    ("🔒 Secure",          ["safe","security","cctv","gated","guard"]),
+    ("🌿 Peaceful",        ["quiet","peaceful","calm","no noise"]),
+    ("❄️ AC Rooms",        ["ac ","air condition","ac room","air-condition"]),
+    ("🍽️ Mess Included",  ["mess","meals included","food included","breakfast"]),
+    ("🪳 Hygiene Issue",  ["cockroach","bugs","dirty","unclean","pest"]),
+    ("🥣 Bad Food",        ["bad food","worst food","repetitive food","tasteless"]),
+    ("🚫 No Parking",      ["no parking","parking issue","congested"]),
+    ("📶 Slow WiFi",       ["slow wifi","no wifi","bad internet","no internet"]),
 ]
+TAG_LABELS   = np.array([lbl for lbl, _ in TAG_RULES], dtype=object)
+TAG_PATTERNS = [re.compile("|".join(map(re.escape, kws)), re.IGNORECASE) for _, kws in TAG_RULES]
 POS = {"🍛 Great Food","🚇 Metro Near","✨ Very Clean","🚀 Fast WiFi","🔒 Secure","🌿 Peaceful","❄️ AC Rooms","🍽️ Mess Included"}
 NEG = {"🪳 Hygiene Issue","🥣 Bad Food","🚫 No Parking","📶 Slow WiFi"}
-
-def generate_tags(text):
-    t = str(text).lower()
-    return [lbl for lbl, fn in TAG_RULES if fn(t)]
-
-def clean_cost(x):
-    if isinstance(x, str):
-        s = x.replace("₹","").replace(",","").strip()
-        if "-" in s:
-            try:
-                a, b = s.split("-", 1)
-                return (float(a.strip()) + float(b.strip())) / 2
-            except: return 0
-        try: return float(s)
-        except: return 0
-    return float(x) if x else 0
+SHARING_ORDER = ["Single", "Two Sharing", "Triple Sharing", "Four Sharing", "Five Sharing"]
+
+def generate_tags(comments):
+    # One vectorised keyword scan per rule over the whole column, then a cheap
+    # per-row gather of the matching labels.
+    hits = np.column_stack([
+        comments.str.contains(pat, regex=True, na=False).to_numpy()
+        for pat in TAG_PATTERNS
+    ])
+    return [TAG_LABELS[row].tolist() for row in hits]
+
+def clean_cost(col):
+    # Vectorised rent parser: strips ₹/commas and averages "lo-hi" ranges.
+    # Anything unparseable becomes 0 and is dropped by the rent bounds later.
+    s     = col.astype(str).str.replace(r"[₹,]", "", regex=True).str.strip()
+    parts = s.str.extract(r"^([^-]*)(?:-(.*))?$")
+    lo    = pd.to_numeric(parts[0].str.strip(), errors="coerce")
+    hi    = pd.to_numeric(parts[1].str.strip(), errors="coerce")
+    return lo.where(parts[1].isna(), (lo + hi) / 2).fillna(0)
 
 # Dark-mode chart color palette
 CHART_COLORS = ["#F5A623","#00C9A7","#5B8CF5","#F0546B","#A78BFA","#34D399","#FB923C","#60A5FA","#F472B6","#FBBF24","#4ADE80"]
+BOX_POINTS_PER_AREA = 200  # cap on dots sent to the browser per area in the rent box plot
 
 def base_layout(height=300):
     return dict(
@@ -536,50 +555,154 @@ def style_axes(fig):
     fig.update_yaxes(gridcolor="#1E2335", zerolinecolor="#1E2335", color="#5C6478")
     return fig
 
-@st.cache_data(ttl=600)
+SHEET_URL = "https://docs.google.com/spreadsheets/d/1AW4EKm412u_UyYhf1swdhDsP5ikadr3XXeUTMrqvh4w/export?format=csv&gid=1856698473"
+CACHE_PATH = Path(__file__).with_name("cache") / "pg.parquet"
+CACHE_TTL  = 600  # seconds
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def _fetch_csv(url):
+    # Network layer only — raw bytes are cheap for Streamlit to hash, so a
+    # sheet refresh with unchanged content reuses the transformed frame below.
+    with urllib.request.urlopen(url) as resp:
+        return resp.read()
+
+@st.cache_data(max_entries=1)  # only the current sheet version stays in memory
+def _transform(raw):
+    df = pd.read_csv(io.BytesIO(raw), engine="pyarrow")  # multithreaded parser
+    df.columns = df.columns.str.strip()
+    df.rename(columns={
+        "Name of PG/Hostel:":    "Name",
+        "Type of PG":            "Type",
+        "🌍 Location:":           "Location",
+        "🏡Type of Sharing:":     "Sharing",
+        "💰 Monthly Cost (₹):":   "Cost",
+        "Overall Rating:":       "Rating",
+        "Additional Comments:":  "Comments",
+        "PG Owner Phone number": "Phone",
+        "Contributor Gender":    "Gender",
+    }, inplace=True)
+
+    df["Cost"]    = clean_cost(df["Cost"])
+    df            = df[(df["Cost"] > 2000) & (df["Cost"] < 60000)]
+    df["Rating"]  = pd.to_numeric(df["Rating"], errors="coerce").fillna(0)
+    # Narrow dtypes halve the bytes scanned by every filter and aggregate;
+    # rents are already bounded well inside int32 by the line above.
+    df["Cost"]    = df["Cost"].round().astype("int32")
+    df["Rating"]  = df["Rating"].astype("float32")
+    df["Location"]= df["Location"].fillna("Unknown").str.strip().str.title()
+    df["Gender"]  = df["Gender"].fillna("Any").str.strip()
+    df["Comments"]= df["Comments"].fillna("").str.strip()
+    df["Name"]    = df["Name"].fillna("Unnamed PG").str.strip()
+    df["Phone"]   = df["Phone"].fillna("").astype(str).str.strip()
+    df["Sharing"] = df["Sharing"].fillna("Unknown").str.strip()
+
+    df["Tags"]       = generate_tags(df["Comments"])
+    df["PosTags"]    = df["Tags"].apply(lambda ts: [t for t in ts if t in POS])
+    df["NegTags"]    = df["Tags"].apply(lambda ts: [t for t in ts if t in NEG])
+    # Exact area match first, then the first word ("Gachibowli Phase 2" ->
+    # "Gachibowli"), then the city-centre fallback.
+    loc_head         = df["Location"].str.split(" ", n=1).str[0]
+    for c in ("lat", "lon"):
+        df[c] = (df["Location"].map(COORDS_DF[c])
+                 .fillna(loc_head.map(COORDS_DF[c]))
+                 .fillna(COORDS_DF.at["Unknown", c]))
+    # Categoricals only after the string work above: Categorical.map can return
+    # a Categorical, which the coordinate fillna chain cannot extend.
+    for c in ("Location", "Gender"):
+        df[c] = df[c].astype("category")
+    # Room types in natural size order rather than alphabetical; any value
+    # outside the known domain is kept and sorted after it.
+    extra         = sorted(set(df["Sharing"]) - set(SHARING_ORDER))
+    df["Sharing"] = (pd.Categorical(df["Sharing"], categories=SHARING_ORDER + extra, ordered=True)
+                     .remove_unused_categories())
+    rating, cost     = df["Rating"].to_numpy("float64"), df["Cost"].to_numpy()
+    df["ValueScore"] = ne.evaluate("where(cost > 0, rating * rating / cost * 5000.0, 0.0)")
+    return df
+
+def filter_options(df):
+    # Built once per load alongside the frame; categories are already sorted
+    # by _transform, so this is just lookups plus one min/max.
+    return dict(
+        locations = df["Location"].cat.categories.tolist(),
+        genders   = df["Gender"].cat.categories.tolist(),
+        sharing   = df["Sharing"].cat.categories.tolist(),
+        cost_min  = int(df["Cost"].min()),
+        cost_max  = int(df["Cost"].max()),
+    )
+
+@st.cache_data(max_entries=1, show_spinner=False)
+def _read_disk_cache(mtime_ns):
+    # Keyed on the file's mtime, so the frame is read once per written version.
+    df = pq.read_table(CACHE_PATH).to_pandas()
+    for c in ("Tags", "PosTags", "NegTags"):
+        df[c] = [a.tolist() for a in df[c]]
+    return df, filter_options(df), mtime_ns
+
+def _load_frame():
+    # Cleaned frame persisted to parquet so a server restart or cache eviction
+    # skips the sheet fetch and re-tagging. The file is only served while it is
+    # younger than CACHE_TTL, so data is never older than one TTL.
+    try:
+        mtime_ns = CACHE_PATH.stat().st_mtime_ns
+    except OSError:
+        mtime_ns = None
+    if mtime_ns is not None and time.time_ns() - mtime_ns < CACHE_TTL * 1_000_000_000:
+        try:
+            return _read_disk_cache(mtime_ns)
+        except (OSError, ValueError, KeyError, pa.ArrowException):
+            pass  # corrupt or incompatible cache file; refetch the sheet below
+
+    raw = _fetch_csv(SHEET_URL)
+    df  = _transform(raw)
+    try:
+        CACHE_PATH.parent.mkdir(exist_ok=True)
+        tmp = CACHE_PATH.with_suffix(".tmp")
+        df.to_parquet(tmp, compression="zstd")
+        os.replace(tmp, CACHE_PATH)  # atomic, readers never see a partial file
+    except OSError:
+        pass  # disk cache is best-effort; the in-memory caches still apply
+    # The raw-bytes digest doubles as a data version for downstream cache keys.
+    return df, filter_options(df), hashlib.sha1(raw).hexdigest()
+
 def load_data():
     try:
-        url = "https://docs.google.com/spreadsheets/d/1AW4EKm412u_UyYhf1swdhDsP5ikadr3XXeUTMrqvh4w/export?format=csv&gid=1856698473"
-        df = pd.read_csv(url)
-        df.columns = df.columns.str.strip()
-        df.rename(columns={
-            "Name of PG/Hostel:":    "Name",
-            "Type of PG":            "Type",
-            "🌍 Location:":           "Location",
-            "🏡Type of Sharing:":     "Sharing",
-            "💰 Monthly Cost (₹):":   "Cost",
-            "Overall Rating:":       "Rating",
-            "Additional Comments:":  "Comments",
-            "PG Owner Phone number": "Phone",
-            "Contributor Gender":    "Gender",
-        }, inplace=True)
-
-        df["Cost"]    = df["Cost"].apply(clean_cost)
-        df            = df[(df["Cost"] > 2000) & (df["Cost"] < 60000)]
-        df["Rating"]  = pd.to_numeric(df["Rating"], errors="coerce").fillna(0)
-        df["Location"]= df["Location"].fillna("Unknown").str.strip().str.title()
-        df["Gender"]  = df["Gender"].fillna("Any").str.strip()
-        df["Comments"]= df["Comments"].fillna("").str.strip()
-        df["Name"]    = df["Name"].fillna("Unnamed PG").str.strip()
-        df["Phone"]   = df["Phone"].fillna("").astype(str).str.strip()
-        df["Sharing"] = df["Sharing"].fillna("Unknown").str.strip()
-
-        df["Tags"]       = df["Comments"].apply(generate_tags)
-        df["PosTags"]    = df["Tags"].apply(lambda ts: [t for t in ts if t in POS])
-        df["NegTags"]    = df["Tags"].apply(lambda ts: [t for t in ts if t in NEG])
-        coords           = df["Location"].map(lambda x: COORDS.get(x, COORDS["Unknown"]))
-        df["lat"]        = coords.map(lambda x: x[0])
-        df["lon"]        = coords.map(lambda x: x[1])
-        df["ValueScore"] = ((df["Rating"] ** 2) / df["Cost"].replace(0, np.nan)) * 5000
-        df["ValueScore"] = df["ValueScore"].fillna(0)
-        return df
+        return _load_frame()
     except Exception as e:
         st.error(f"Could not load data: {e}")
         return None
 
-df = load_data()
-if df is None:
+@st.cache_data(max_entries=64)
+def summarise(_fdf, data_version, filters):
+    # Keyed on the filter state plus the load version; the frame itself is
+    # not hashed. Per-area means via bincount over the category codes.
+    loc    = _fdf["Location"].cat
+    codes  = loc.codes.to_numpy()
+    n      = len(loc.categories)
+    counts = np.bincount(codes, minlength=n)
+    seen   = counts > 0
+    area_stats = pd.DataFrame({
+        "avg_rent":   np.bincount(codes, weights=_fdf["Cost"].to_numpy(),   minlength=n)[seen] / counts[seen],
+        "avg_rating": np.bincount(codes, weights=_fdf["Rating"].to_numpy(), minlength=n)[seen] / counts[seen],
+        "count":      counts[seen],
+    }, index=pd.Index(loc.categories[seen], name="Location"))
+    # Random per-area cap on the box plot's points so large areas don't ship
+    # every row to the browser; areas under the cap are drawn in full.
+    # Only the sampled row labels are cached, not a copy of the rows.
+    box_rows = None
+    if len(_fdf) > BOX_POINTS_PER_AREA:
+        rank = _fdf.sample(frac=1, random_state=0).groupby("Location", observed=True).cumcount()
+        box_rows = rank.index[rank.to_numpy() < BOX_POINTS_PER_AREA].sort_values()
+    return dict(
+        avg_cost_location = area_stats["avg_rent"].rename("Cost"),
+        area_stats        = area_stats.sort_values("avg_rent"),
+        gender_counts     = _fdf["Gender"].value_counts().loc[lambda s: s > 0],
+        box_rows          = box_rows,
+    )
+
+loaded = load_data()
+if loaded is None:
     st.stop()
+df, opts, data_version = loaded
 
 # ─────────────────────────────────────────────
 #  HERO
@@ -623,13 +746,13 @@ st.markdown(f"""
 fc1, fc2, fc3, fc4, fc5 = st.columns([2, 2, 2, 3, 2])
 
 with fc1:
-    sel_loc = st.selectbox("📍 Area", ["All Areas"] + sorted(df["Location"].unique().tolist()))
+    sel_loc = st.selectbox("📍 Area", ["All Areas"] + opts["locations"])
 with fc2:
-    sel_gender = st.selectbox("🚻 Gender Preference", ["Any"] + sorted(df["Gender"].unique().tolist()))
+    sel_gender = st.selectbox("🚻 Gender Preference", ["Any"] + opts["genders"])
 with fc3:
-    sel_share = st.selectbox("🏠 Room Type", ["Any"] + sorted(df["Sharing"].dropna().unique().tolist()))
+    sel_share = st.selectbox("🏠 Room Type", ["Any"] + opts["sharing"])
 with fc4:
-    budget = st.slider("💰 Max Budget", int(df["Cost"].min()), int(df["Cost"].max()), 25000, 500, format="₹%d")
+    budget = st.slider("💰 Max Budget", opts["cost_min"], opts["cost_max"], 25000, 500, format="₹%d")
 with fc5:
     min_rat = st.slider("⭐ Min Rating", 0.0, 5.0, 0.0, 0.5)
 
@@ -654,12 +777,13 @@ st.markdown("</div>", unsafe_allow_html=True)
 # ─────────────────────────────────────────────
 #  FILTER LOGIC
 # ─────────────────────────────────────────────
-fdf = df.copy()
-if sel_loc    != "All Areas": fdf = fdf[fdf["Location"] == sel_loc]
-if sel_gender != "Any":       fdf = fdf[fdf["Gender"]   == sel_gender]
-if sel_share  != "Any":       fdf = fdf[fdf["Sharing"]  == sel_share]
-fdf = fdf[fdf["Cost"]   <= budget]
-fdf = fdf[fdf["Rating"] >= min_rat]
+# Single query over the cached frame: numeric bounds are evaluated by numexpr
+# in one fused pass instead of materialising a mask per filter.
+conds = ["Cost <= @budget", "Rating >= @min_rat"]
+if sel_loc    != "All Areas": conds.append("Location == @sel_loc")
+if sel_gender != "Any":       conds.append("Gender == @sel_gender")
+if sel_share  != "Any":       conds.append("Sharing == @sel_share")
+fdf = df.query(" and ".join(conds))
 
 if global_search.strip():
     q = global_search.strip()
@@ -675,6 +799,9 @@ if global_search.strip():
     fdf = fdf[text_mask]
 
 fdf = fdf.sort_values("ValueScore", ascending=False).reset_index(drop=True)
+summary = summarise(fdf, data_version,
+                    (sel_loc, sel_gender, sel_share, budget, min_rat, global_search.strip()))
+box_points = fdf if summary["box_rows"] is None else fdf.loc[summary["box_rows"]]
 
 # ─────────────────────────────────────────────
 #  CONTENT
@@ -684,10 +811,8 @@ st.markdown('<div class="content">', unsafe_allow_html=True)
 # ── stat strip ──
 avg_cost = int(fdf["Cost"].mean()) if not fdf.empty else 0
 avg_rat  = fdf["Rating"].mean()    if not fdf.empty else 0
-try:    cheap_area = fdf.groupby("Location")["Cost"].mean().idxmin()
-except: cheap_area = "—"
-try:    best_area  = fdf[fdf["Rating"] > 0].groupby("Location")["Rating"].mean().idxmax()
-except: best_area  = "—"
+avg_by_loc = summary["avg_cost_location"]
+cheap_area = avg_by_loc.idxmin() if len(avg_by_loc) else "—"
 
 st.markdown(f"""
 <div class="stat-strip">
@@ -714,6 +839,78 @@ st.markdown(f"""
 </div>
 """, unsafe_allow_html=True)
 
+@st.fragment
+def render_pick_cards(top):
+    # Fragment: the contact/copy buttons rerun only these cards, not the
+    # filters, charts and map below.
+    ranks   = ["🥇","🥈","🥉"] + [f"#{i+1}" for i in range(3, len(top))]
+    classes = ["gold","silver","bronze"] + [""]*max(0, len(top)-3)
+
+    for i, row in enumerate(top.itertuples(index=False)):
+        chips = (f'<span class="chip cs">⭐ {row.Rating:.1f}</span>'
+                 f'<span class="chip cn">{row.Sharing}</span>'
+                 f'<span class="chip cb">{row.Gender}</span>')
+        pos_chips = "".join(f'<span class="chip cg">{t}</span>' for t in row.PosTags[:4])
+        neg_chips = "".join(f'<span class="chip cr">{t}</span>' for t in row.NegTags[:2])
+        tag_row   = f'<div class="chips">{pos_chips}{neg_chips}</div>' if pos_chips or neg_chips else ""
+        quote     = f'<div class="pg-quote">"{row.Comments[:130]}"</div>' if row.Comments else ""
+
+        st.markdown(f"""
+        <div class="pg-card {classes[i]}">
+          <span class="pg-rank">{ranks[i]}</span>
+          <div class="pg-name">{row.Name}</div>
+          <div class="pg-loc">📍 {row.Location}</div>
+          <div class="chips">{chips}</div>
+          {tag_row}
+          <div class="pg-price">₹{int(row.Cost):,} <span>/month</span></div>
+          {quote}
+        </div>""", unsafe_allow_html=True)
+
+        ca, cb = st.columns(2)
+        with ca:
+            if st.button("📞 Show Contact", key=f"ph_{i}"):
+                ph = str(row.Phone).strip()
+                if ph and ph not in ["nan", ""]:
+                    st.success(f"📱 {ph}")
+                else:
+                    st.info("No contact listed for this PG.")
+        with cb:
+            if st.button("📋 Copy Details", key=f"cp_{i}"):
+                st.code(f"{row.Name} | {row.Location} | ₹{int(row.Cost):,}/mo | ⭐{row.Rating:.1f} | {row.Phone}")
+
+@st.fragment
+def render_directory(fdf):
+    # Fragment: typing in the directory search reruns only this table.
+    search = st.text_input("🔍 Search by name, area or keyword",
+                           placeholder="e.g. Gachibowli, clean, AC, WiFi, metro…")
+    show_df = fdf  # read-only below; the search mask rebinds rather than mutates
+    if search.strip():
+        mask = (
+            show_df["Name"].str.contains(search, case=False, na=False) |
+            show_df["Location"].str.contains(search, case=False, na=False) |
+            show_df["Comments"].str.contains(search, case=False, na=False)
+        )
+        show_df = show_df[mask]
+        st.caption(f'Showing {len(show_df)} results for "{search}"')
+
+    cols = ["Name","Location","Sharing","Gender","Cost","Rating","Phone","Comments"]
+    st.dataframe(
+        show_df[cols],
+        column_config={
+            "Name":     st.column_config.TextColumn("PG Name",   width="medium"),
+            "Cost":     st.column_config.NumberColumn("Rent/mo", format="₹%d"),
+            "Rating":   st.column_config.ProgressColumn("Rating",min_value=0, max_value=5, format="%.1f ⭐"),
+            "Comments": st.column_config.TextColumn("Reviews",   width="large"),
+            "Phone":    st.column_config.TextColumn("Contact",   width="small"),
+        },
+        hide_index=True, use_container_width=True, height=520,
+    )
+
+    csv = show_df[cols].to_csv(index=False).encode("utf-8")
+    st.download_button("📥 Export as CSV", data=csv,
+                       file_name="hyd_pg_list.csv", mime="text/csv",
+                       use_container_width=True)
+
 # ─────────────────────────────────────────────
 #  TABS
 # ─────────────────────────────────────────────
@@ -748,47 +945,13 @@ with t1:
 
         with left:
             show_n  = min(10, len(fdf))
-            ranks   = ["🥇","🥈","🥉"] + [f"#{i+1}" for i in range(3, show_n)]
-            classes = ["gold","silver","bronze"] + [""]*max(0, show_n-3)
-
             st.markdown(f"""
             <div class="sec-head">
               <span class="sec-title">Top {show_n} PGs</span>
               <span class="sec-badge">{len(fdf)} matching</span>
             </div>""", unsafe_allow_html=True)
 
-            for i in range(show_n):
-                row = fdf.iloc[i]
-                chips = (f'<span class="chip cs">⭐ {row["Rating"]:.1f}</span>'
-                         f'<span class="chip cn">{row["Sharing"]}</span>'
-                         f'<span class="chip cb">{row["Gender"]}</span>')
-                pos_chips = "".join(f'<span class="chip cg">{t}</span>' for t in row["PosTags"][:4])
-                neg_chips = "".join(f'<span class="chip cr">{t}</span>' for t in row["NegTags"][:2])
-                tag_row   = f'<div class="chips">{pos_chips}{neg_chips}</div>' if pos_chips or neg_chips else ""
-                quote     = f'<div class="pg-quote">"{row["Comments"][:130]}"</div>' if row["Comments"] else ""
-
-                st.markdown(f"""
-                <div class="pg-card {classes[i]}">
-                  <span class="pg-rank">{ranks[i]}</span>
-                  <div class="pg-name">{row['Name']}</div>
-                  <div class="pg-loc">📍 {row['Location']}</div>
-                  <div class="chips">{chips}</div>
-                  {tag_row}
-                  <div class="pg-price">₹{int(row['Cost']):,} <span>/month</span></div>
-                  {quote}
-                </div>""", unsafe_allow_html=True)
-
-                ca, cb = st.columns(2)
-                with ca:
-                    if st.button("📞 Show Contact", key=f"ph_{i}"):
-                        ph = str(row["Phone"]).strip()
-                        if ph and ph not in ["nan", ""]:
-                            st.success(f"📱 {ph}")
-                        else:
-                            st.info("No contact listed for this PG.")
-                with cb:
-                    if st.button("📋 Copy Details", key=f"cp_{i}"):
-                        st.code(f"{row['Name']} | {row['Location']} | ₹{int(row['Cost']):,}/mo | ⭐{row['Rating']:.1f} | {row['Phone']}")
+            render_pick_cards(fdf.head(show_n))
 
         with right:
             st.markdown("""
@@ -822,14 +985,12 @@ with t1:
             style_axes(fig)
             st.plotly_chart(fig, use_container_width=True)
 
-            area_stats = (fdf.groupby("Location")
-                          .agg(avg_rent=("Cost","mean"), avg_rating=("Rating","mean"), count=("Name","count"))
-                          .sort_values("avg_rent"))
+            area_stats = summary["area_stats"]
             rows_html = "".join(f"""
             <div class="irow">
-              <span>📍 {area} <span style="color:#3A4155;font-size:11px;">({int(row['count'])} PGs)</span></span>
-              <span class="ival">₹{int(row['avg_rent']):,} · {row['avg_rating']:.1f}⭐</span>
-            </div>""" for area, row in area_stats.iterrows())
+              <span>📍 {row.Index} <span style="color:#3A4155;font-size:11px;">({int(row.count)} PGs)</span></span>
+              <span class="ival">₹{int(row.avg_rent):,} · {row.avg_rating:.1f}⭐</span>
+            </div>""" for row in area_stats.itertuples())
             st.markdown(f"""
             <div class="insight">
               <div class="insight-lbl">Area Summary — cheapest first</div>
@@ -845,12 +1006,20 @@ with t2:
     else:
         r1, r2 = st.columns([3, 2], gap="large")
         with r1:
-            st.markdown('<div class="chart-title">Rent Range by Area</div><div class="chart-sub">Each dot is a PG. Box = median & spread.</div>', unsafe_allow_html=True)
+            st.markdown(f'<div class="chart-title">Rent Range by Area</div><div class="chart-sub">Box = median & spread of every PG. Dots are individual PGs (up to {BOX_POINTS_PER_AREA} per area).</div>', unsafe_allow_html=True)
+            # Box stats from the full filtered set; the capped sample is only
+            # overlaid as dots. A shared area order keeps both layers' colours aligned.
+            area_order = fdf["Location"].unique().tolist()
             fig_box = px.box(fdf, x="Location", y="Cost", color="Location",
-                             points="all", hover_data=["Name","Rating"],
+                             points=False,
+                             category_orders={"Location": area_order},
                              template="simple_white",
                              color_discrete_sequence=CHART_COLORS)
-            fig_box.update_layout(**base_layout(300), showlegend=False,
+            fig_box.add_traces(px.strip(box_points, x="Location", y="Cost", color="Location",
+                                        hover_data=["Name","Rating"],
+                                        category_orders={"Location": area_order},
+                                        color_discrete_sequence=CHART_COLORS).data)
+            fig_box.update_layout(**base_layout(300), showlegend=False, boxmode="overlay",
                                   xaxis_title="", yaxis_title="Monthly Rent (₹)")
             style_axes(fig_box)
             st.plotly_chart(fig_box, use_container_width=True)
@@ -868,7 +1037,7 @@ with t2:
         r3, r4 = st.columns(2, gap="large")
         with r3:
             st.markdown('<div class="chart-title">Avg Rent by Area</div><div class="chart-sub">Sorted cheapest → priciest.</div>', unsafe_allow_html=True)
-            aa = fdf.groupby("Location")["Cost"].mean().sort_values().reset_index()
+            aa = summary["avg_cost_location"].sort_values().reset_index()
             fig_bar = px.bar(aa, x="Cost", y="Location", orientation="h",
                              template="simple_white", color="Cost",
                              color_continuous_scale=["#1A1F2E","#F5A623"],
@@ -894,7 +1063,7 @@ with t2:
             st.markdown('<div class="chart-title">Does Paying More Mean Better?</div><div class="chart-sub">Cost vs rating with trend line.</div>', unsafe_allow_html=True)
             fig_sc = px.scatter(fdf[fdf["Rating"] > 0], x="Cost", y="Rating",
                                 color="Sharing", hover_name="Name",
-                                opacity=0.75,
+                                opacity=0.75, render_mode="webgl",
                                 template="simple_white",
                                 color_discrete_sequence=CHART_COLORS)
             fig_sc.update_layout(**base_layout(260),
@@ -906,7 +1075,7 @@ with t2:
 
         with r6:
             st.markdown('<div class="chart-title">Gender Preference Mix</div><div class="chart-sub">Availability across gender categories.</div>', unsafe_allow_html=True)
-            gc = fdf["Gender"].value_counts().reset_index()
+            gc = summary["gender_counts"].reset_index()
             gc.columns = ["Gender","Count"]
             fig_gen = px.bar(gc, x="Gender", y="Count", template="simple_white",
                              color="Gender",
@@ -930,8 +1099,8 @@ with t3:
         </div>""", unsafe_allow_html=True)
 
         map_df = fdf[["lat","lon","Name","Location","Cost","Rating","Sharing"]].copy()
-        map_df["lat"] += np.random.normal(0, 0.0025, len(map_df))
-        map_df["lon"] += np.random.normal(0, 0.0025, len(map_df))
+        if len(map_df) > 1:
+            map_df[["lat","lon"]] += _rng.standard_normal((len(map_df), 2)) * 0.0025
 
         fig_map = px.scatter_mapbox(
             map_df, lat="lat", lon="lon",
@@ -965,35 +1134,7 @@ with t4:
           <div class="empty-sub">Adjust the filters above to see listings.</div>
         </div>""", unsafe_allow_html=True)
     else:
-        search = st.text_input("🔍 Search by name, area or keyword",
-                               placeholder="e.g. Gachibowli, clean, AC, WiFi, metro…")
-        show_df = fdf.copy()
-        if search.strip():
-            mask = (
-                show_df["Name"].str.contains(search, case=False, na=False) |
-                show_df["Location"].str.contains(search, case=False, na=False) |
-                show_df["Comments"].str.contains(search, case=False, na=False)
-            )
-            show_df = show_df[mask]
-            st.caption(f'Showing {len(show_df)} results for "{search}"')
-
-        cols = ["Name","Location","Sharing","Gender","Cost","Rating","Phone","Comments"]
-        st.dataframe(
-            show_df[cols],
-            column_config={
-                "Name":     st.column_config.TextColumn("PG Name",   width="medium"),
-                "Cost":     st.column_config.NumberColumn("Rent/mo", format="₹%d"),
-                "Rating":   st.column_config.ProgressColumn("Rating",min_value=0, max_value=5, format="%.1f ⭐"),
-                "Comments": st.column_config.TextColumn("Reviews",   width="large"),
-                "Phone":    st.column_config.TextColumn("Contact",   width="small"),
-            },
-            hide_index=True, use_container_width=True, height=520,
-        )
-
-        csv = show_df[cols].to_csv(index=False).encode("utf-8")
-        st.download_button("📥 Export as CSV", data=csv,
-                           file_name="hyd_pg_list.csv", mime="text/csv",
-                           use_container_width=True)
+        render_directory(fdf)
 
 st.markdown("</div>", unsafe_allow_html=True)
 